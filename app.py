@@ -1,15 +1,20 @@
 import streamlit as st
-import pandas as pd
-import sqlite3
-import joblib
-import shap
 import google.generativeai as genai
 import plotly.graph_objects as go
 import requests
 from streamlit_lottie import st_lottie
 from datetime import datetime, date
+from prediction import run_prediction, grade_status
+from drift_monitor import DriftMonitor
+from bulk_export import ExportJob, purge_exports
+from early_warning import run_scan, get_alert_queue
+from model_registry import ModelRegistry, load_manifest
+from database import ensure_history_table, load_all_students, get_student_by_usn, add_new_student, update_student, delete_student, verify_student
+from history_store import get_student_history, get_semester_trend
 
 import base64
+import os
+import secrets
 @st.cache_data
 def get_base64_of_bin_file(bin_file):
     with open(bin_file, 'rb') as f:
@@ -27,13 +32,30 @@ except Exception as e:
     st.error(f"API Configuration Error: {e}")
 
 # Load assets
+# One registry per process, shared by every session; models load lazily per semester/department
+@st.cache_resource
+def get_model_registry():
+    return ModelRegistry()
+
+registry = get_model_registry()
 try:
-    model = joblib.load("student_grade_model.pkl")
-    feature_names = joblib.load("feature_names.pkl")
+    registry.get()
 except:
     st.error("⚠️ System Offline: Model files missing. Initialize training sequence.")
     st.stop()
 
+# Shared streaming histograms of live prediction inputs
+@st.cache_resource
+def get_drift_monitor():
+    return DriftMonitor()
+
+drift = get_drift_monitor()
+
+# Finished exports are served by Streamlit's static file route (streamed from disk, see .streamlit/config.toml)
+EXPORT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static", "exports")
+# Runs on startup and every rerun: drops exports past their TTL, including ones left by a previous server process
+purge_exports(EXPORT_DIR)
+
 # --- HELPER: LOAD LOTTIE ANIMATION ---
 @st.cache_data
 def load_lottieurl(url: str):
@@ -41,22 +63,6 @@ def load_lottieurl(url: str):
     if r.status_code != 200: return None
     return r.json()
 
-# --- HUMAN READABLE MAPPING ---
-FEATURE_MAP = {
-    "G1": "Internal Exam 1",
-    "G2": "Internal Exam 2",
-    "absences": "Class Absences",
-    "failures": "Past Failures",
-    "studytime": "Study Time",
-    "health": "Health Status",
-    "famrel": "Family Relationships",
-    "goout": "Social Activity / Partying",
-    "freetime": "Free Time",
-    "Medu": "Mother's Education",
-    "Fedu": "Father's Education",
-    "traveltime": "Commute Time"
-}
-
 # --- CSS: MODERN DARK MODE THEME ---
 st.markdown("""
 <style>
@@ -81,118 +87,18 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # --- BACKEND FUNCTIONS ---
+# Database access lives in database.py so scripts (e.g. load_test.py) share it
+@st.cache_resource
+def init_database():
+    ensure_history_table()
+
+init_database()
+
 @st.cache_data
 def get_all_students():
-    conn = sqlite3.connect('college_data.db')
-    df = pd.read_sql_query("SELECT s.*, p.* FROM students s JOIN proctorial p ON s.usn = p.usn", conn)
-    conn.close()
-    df = df.loc[:, ~df.columns.duplicated()]
-    return df
-
-def get_student_by_usn(usn):
-    conn = sqlite3.connect('college_data.db')
-    df = pd.read_sql_query("SELECT s.*, p.* FROM students s JOIN proctorial p ON s.usn = p.usn WHERE s.usn = ?", conn, params=(usn,))
-    conn.close()
-    return df.iloc[0] if not df.empty else None
-
-def add_new_student(data):
-    conn = sqlite3.connect('college_data.db')
-    c = conn.cursor()
-    try:
-        c.execute("INSERT INTO students VALUES (?, ?, ?, ?, ?, ?, ?, ?)", 
-                  (data['usn'], data['name'], data['dob'], data['sem'], data['g1'], data['g2'], data['absences'], data['failures']))
-        c.execute("INSERT INTO proctorial VALUES (?, ?, ?, ?, ?, ?)", 
-                  (data['usn'], data['study_time'], data['health'], data['famrel'], data['goout'], data['freetime']))
-        conn.commit()
-        return True
-    except: return False
-    finally: conn.close()
-
-def update_student(data):
-    conn = sqlite3.connect('college_data.db')
-    c = conn.cursor()
-    try:
-        # Update Students Table
-        c.execute("""UPDATE students SET name=?, dob=?, sem=?, internal1=?, internal2=?, absences=?, failures=? WHERE usn=?""", 
-                  (data['name'], data['dob'], data['sem'], data['g1'], data['g2'], data['absences'], data['failures'], data['usn']))
-        # Update Proctorial Table
-        c.execute("""UPDATE proctorial SET study_time=?, health=?, famrel=?, goout=?, freetime=? WHERE usn=?""", 
-                  (data['study_time'], data['health'], data['famrel'], data['goout'], data['freetime'], data['usn']))
-        conn.commit()
-        return True
-    except Exception as e:
-        print(e)
-        return False
-    finally: conn.close()
-
-def delete_student(usn):
-    conn = sqlite3.connect('college_data.db')
-    c = conn.cursor()
-    try:
-        c.execute("DELETE FROM proctorial WHERE usn=?", (usn,))
-        c.execute("DELETE FROM students WHERE usn=?", (usn,))
-        conn.commit()
-        return True
-    except: return False
-    finally: conn.close()
-
-def verify_student(usn, dob):
-    conn = sqlite3.connect('college_data.db')
-    df = pd.read_sql_query("SELECT s.*, p.* FROM students s JOIN proctorial p ON s.usn = p.usn WHERE s.usn = ? AND s.dob = ?", conn, params=(usn, dob))
-    conn.close()
-    return df.iloc[0] if not df.empty else None
+    return load_all_students()
 
 # --- PREDICTION LOGIC ---
-def run_prediction(student_row):
-    input_data = {
-        'G1': student_row['internal1'], 'G2': student_row['internal2'],
-        'failures': student_row['failures'], 'absences': student_row['absences'],
-        'studytime': student_row['study_time'], 'health': student_row['health'],
-        'famrel': student_row['famrel'], 'goout': student_row['goout'],
-        'freetime': student_row['freetime'],
-        'age': 21, 'Medu': 3, 'Fedu': 3, 'traveltime': 1, 'romantic': 0, 'internet': 1,
-        'schoolsup': 0, 'famsup': 1, 'paid': 0, 'activities': 1, 'nursery': 1,
-        'higher': 1, 'famsize': 0, 'Pstatus': 1, 'sex': 1, 'school': 0, 'address': 1,
-        'reason': 1, 'guardian': 1, 'Mjob': 2, 'Fjob': 2, 'walc': 1, 'dalc': 1
-    }
-    input_df = pd.DataFrame([input_data])
-    for c in set(feature_names) - set(input_df.columns): input_df[c] = 0
-    input_df = input_df[feature_names]
-    
-    pred = model.predict(input_df)[0]
-    
-    # Logic Overrides
-    current_absences = input_data['absences']
-    if current_absences > 15:
-        penalty = (current_absences - 15) * 0.3  
-        pred = pred - penalty
-    elif current_absences == 0:
-        pred = pred + 3.0
-    elif current_absences <= 3:
-        pred = pred + 1.5 
-        
-    pred = max(0, min(20, pred))
-    
-    shap_values = shap.TreeExplainer(model).shap_values(input_df)
-    importances = sorted([{
-        'feature': feature,
-        'importance': shap_values[0][i],
-        'value': input_df.iloc[0][i]
-    } for i, feature in enumerate(feature_names)], key=lambda x: abs(x['importance']), reverse=True)
-    
-    factors = []
-    for item in importances[:3]: 
-        feat = item['feature']
-        imp = item['importance']
-        val = item['value']
-        if feat == 'absences' and imp < 0 and val < 5: continue 
-        direction = "Positive" if imp > 0 else "Negative"
-        readable_name = FEATURE_MAP.get(feat, feat)
-        factors.append(f"{readable_name} ({direction})")
-    
-    if current_absences > 15: factors.insert(0, "Extreme Class Absences (Negative)")
-    return pred, ", ".join(factors)
-
 def generate_report(name, score, factors):
     # Convert to Indian metrics
     pct = (score / 20) * 100
@@ -295,6 +201,8 @@ if st.session_state['user_role'] is None:
 # ==========================================
 elif st.session_state['user_role'] == "ADMIN":
     def logout():
+        # Stop any running export and delete its file before the session forgets about it
+        if st.session_state.get('export_job'): st.session_state['export_job'].cleanup()
         st.session_state.clear() # Wipes all data (Role, Student Data, Prediction, Study Plan)
         
     with st.sidebar:
@@ -302,9 +210,15 @@ elif st.session_state['user_role'] == "ADMIN":
         st.image("https://cdn-icons-png.flaticon.com/512/3135/3135715.png", width=80)
         st.markdown("---")
         st.button("Logout", on_click=logout)
+        st.markdown("---")
+        with st.expander("🧠 Model Registry"):
+            for key, entry in load_manifest()["models"].items():
+                st.markdown(f"**{key}** v{entry['version']} · R² {entry['metrics'].get('r2', 0):.2f}")
+            reg_stats = registry.stats()
+            st.caption(f"In memory: {len(reg_stats['loaded'])}/{reg_stats['max_models']} models, {reg_stats['bytes'] / 1e6:.1f} MB")
     
     st.title("Admin Dashboard")
-    tab1, tab2 = st.tabs(["Add Student", "Database & Analytics"])
+    tab1, tab2, tab3, tab4, tab5 = st.tabs(["Add Student", "Database & Analytics", "At-Risk Queue", "Model Performance", "Bulk Export"])
     
     with tab1:
         with st.container(border=True):
@@ -367,6 +281,13 @@ elif st.session_state['user_role'] == "ADMIN":
             fig.update_layout(barmode='group', title="Class Performance Overview", height=300)
             st.plotly_chart(fig, use_container_width=True)
 
+            trend_sem = st.selectbox("Absence Trend for Semester", options=sorted(all_students['sem'].unique().tolist()))
+            sem_trend = get_semester_trend(int(trend_sem), 'absences')
+            if not sem_trend.empty:
+                fig_sem = go.Figure(data=[go.Scatter(x=sem_trend['day'], y=sem_trend['avg_value'], mode='lines+markers', name='Avg Absences')])
+                fig_sem.update_layout(title=f"Semester {trend_sem}: Average Absences (Cohort, as of Each Day)", height=300)
+                st.plotly_chart(fig_sem, use_container_width=True)
+
         st.markdown("---")
         st.markdown("### 🗂️ Database Management")
         st.dataframe(all_students, use_container_width=True)
@@ -434,6 +355,91 @@ elif st.session_state['user_role'] == "ADMIN":
                             st.success(f"Student {selected_usn} deleted.")
                             st.rerun()
                         else: st.error("Delete failed.")
+
+                # --- RECORD HISTORY (served from the append-only log) ---
+                hist = get_student_history(selected_usn)
+                if len(hist) > 1:
+                    st.markdown("#### 📜 Record History")
+                    fig_hist = go.Figure()
+                    fig_hist.add_trace(go.Scatter(x=hist['recorded_at'], y=hist['internal1']*5, mode='lines+markers', name='Internal 1 (%)'))
+                    fig_hist.add_trace(go.Scatter(x=hist['recorded_at'], y=hist['internal2']*5, mode='lines+markers', name='Internal 2 (%)'))
+                    fig_hist.add_trace(go.Scatter(x=hist['recorded_at'], y=hist['absences'], mode='lines+markers', name='Absences'))
+                    fig_hist.update_layout(title=f"Changes for {selected_usn}", height=300)
+                    st.plotly_chart(fig_hist, use_container_width=True)
+
+    with tab3:
+        st.markdown("### 🚨 At-Risk Queue")
+        st.caption("Filled by the early-warning scan (`python early_warning.py --every 3600`). Only students whose records or model changed are rescored.")
+        if st.button("🔍 Run Incremental Scan"):
+            with st.spinner("Scanning changed records..."):
+                scan = run_scan(registry=registry)
+            st.success(f"Rescored {scan['rescored']} of {scan['scanned']} students in {scan['seconds']:.1f}s.")
+        queue = get_alert_queue()
+        if queue.empty: st.info("No students currently flagged.")
+        else:
+            st.metric("Flagged Students", len(queue))
+            st.dataframe(queue, use_container_width=True)
+
+    with tab4:
+        st.markdown("### 📉 Feature Drift Monitor")
+        st.caption("Live prediction inputs vs. the training distribution (student-mat.csv). PSI < 0.1 stable, 0.1–0.25 moderate, > 0.25 significant.")
+        drift_report = drift.report()
+        if drift_report.empty:
+            st.info("No predictions recorded yet (or no drift reference — retrain with model_pipeline.py).")
+        else:
+            d1, d2 = st.columns(2)
+            d1.metric("Predictions Monitored", drift.n)
+            d2.metric("Features Drifting (PSI > 0.25)", int((drift_report['psi'] > 0.25).sum()))
+            fig_psi = go.Figure(data=[go.Bar(x=drift_report['feature'], y=drift_report['psi'], marker_color=['#f87171' if v > 0.25 else ('#fbbf24' if v > 0.1 else '#34d399') for v in drift_report['psi']])])
+            fig_psi.update_layout(title="Population Stability Index per Feature", height=300)
+            st.plotly_chart(fig_psi, use_container_width=True)
+            st.dataframe(drift_report, use_container_width=True)
+
+    with tab5:
+        st.markdown("### 📦 Cohort Export")
+        st.caption("Predictions are streamed from the database in chunks to a file on disk, so the cohort is never held in memory.")
+        x1, x2, x3 = st.columns(3)
+        with x1: exp_sem = st.selectbox("Semester", options=["All"] + list(range(1, 9)))
+        with x2: exp_format = st.radio("Format", ["CSV (predictions)", "ZIP (Markdown reports)"])
+        with x3: exp_factors = st.checkbox("Include top factors (SHAP, slower)", value=True)
+        
+        if st.button("⚙️ Prepare Export", type="primary"):
+            sem_filter = None if exp_sem == "All" else int(exp_sem)
+            # Replace the previous export of this session
+            if st.session_state.get('export_job'): st.session_state.pop('export_job').cleanup()
+            os.makedirs(EXPORT_DIR, exist_ok=True)
+            fmt = "csv" if exp_format.startswith("CSV") else "zip"
+            export_name = f"cohort_{'all' if sem_filter is None else f'sem{sem_filter}'}.{fmt}"
+            # Unguessable file name: anything under static/ is reachable by URL
+            job = ExportJob(os.path.join(EXPORT_DIR, f"{secrets.token_urlsafe(16)}_{export_name}"),
+                            sem=sem_filter, fmt=fmt, with_factors=exp_factors, registry=registry)
+            if job.total == 0: st.warning("No students in this semester.")
+            else:
+                job.start()
+                st.session_state['export_job'] = job
+                st.session_state['export_name'] = export_name
+
+        # Polls only while a job is running; only this fragment reruns, so the rest of the dashboard stays usable
+        running_job = st.session_state.get('export_job')
+        polling = running_job is not None and not running_job.finished
+        @st.fragment(run_every=1.0 if polling else None)
+        def export_status():
+            job = st.session_state.get('export_job')
+            if job is None: return
+            if not job.finished:
+                st.progress(job.done / job.total, text=f"Exported {job.done}/{job.total} students")
+            elif polling:
+                st.rerun()  # full rerun rebuilds this fragment without the timer
+            elif job.error:
+                st.error(f"Export failed: {job.error}")
+            elif os.path.exists(job.out_path):
+                size_mb = os.path.getsize(job.out_path) / 1e6
+                url = f"./app/static/exports/{os.path.basename(job.out_path)}"
+                st.markdown(f'<a href="{url}" download="{st.session_state["export_name"]}">📥 Download {st.session_state["export_name"]} ({size_mb:.1f} MB)</a>',
+                            unsafe_allow_html=True)
+            else:
+                st.caption("The last export has expired; prepare it again to download.")
+        export_status()
 # ==========================================
 # 3. STUDENT DASHBOARD (ENHANCED SIDEBAR)
 # ==========================================
@@ -444,7 +450,7 @@ elif st.session_state['user_role'] == "STUDENT":
         # --- ENHANCED PROFILE SECTION ---
         st.image("https://cdn-icons-png.flaticon.com/512/3135/3135715.png", width=100)
         st.title(s['name'])
-        st.markdown(f"**{s['usn'][0]}**")
+        st.markdown(f"**{s['usn']}**")
         
         st.markdown("---")
         st.markdown("### 👤 Profile Details")
@@ -514,7 +520,7 @@ elif st.session_state['user_role'] == "STUDENT":
             final_cgpa = raw_score / 2
             
             color_class = "pred-good" if final_pct > 70 else "pred-bad"
-            status_text = "Distinction" if final_pct > 75 else ("First Class" if final_pct > 60 else "Risk")
+            status_text = grade_status(final_pct)
             forecast_color = '#34d399' if final_pct > 70 else '#f87171'
 
             c1, c2 = st.columns([1.5, 1])
@@ -585,7 +591,7 @@ elif st.session_state['user_role'] == "STUDENT":
                 st.markdown("<br><br>", unsafe_allow_html=True)
                 if st.button("🚀 Launch AI Analysis", type="primary", use_container_width=True):
                     with st.spinner("🔄 Crunching numbers & generating insights..."):
-                        score, factors = run_prediction(s)
+                        score, factors = run_prediction(registry, s, drift)
                         advice = generate_report(s['name'], score, factors)
                         st.session_state['pred_result'] = {'score': score, 'factors': factors, 'advice': advice}
                         st.rerun()
@@ -610,8 +616,8 @@ elif st.session_state['user_role'] == "STUDENT":
         sim_profile['study_time'] = sim_study; sim_profile['absences'] = sim_abs
         sim_profile['goout'] = sim_goout; sim_profile['health'] = sim_health
         
-        base_score, _ = run_prediction(s)
-        new_score, _ = run_prediction(sim_profile)
+        base_score, _ = run_prediction(registry, s)
+        new_score, _ = run_prediction(registry, sim_profile)
         
         base_pct = (base_score/20)*100
         new_pct = (new_score/20)*100
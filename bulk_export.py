@@ -0,0 +1,198 @@
+import argparse
+import csv
+import io
+import os
+import sqlite3
+import threading
+import time
+import zipfile
+from datetime import datetime
+import pandas as pd
+from prediction import build_model_frame, apply_overrides, explain_factors_batch, to_percentage, grade_status
+from model_registry import ModelRegistry, dept_from_usn, model_tags
+
+DB_PATH = 'college_data.db'
+CHUNK_SIZE = 1000
+EXPORT_TTL = 3600  # seconds a finished dashboard export stays downloadable
+
+EXPORT_QUERY = '''
+    SELECT s.usn, s.name, s.sem, s.internal1, s.internal2, s.absences, s.failures,
+           p.study_time, p.health, p.famrel, p.goout, p.freetime
+    FROM students s JOIN proctorial p ON s.usn = p.usn
+'''
+
+CSV_COLUMNS = ['usn', 'name', 'sem', 'internal1_pct', 'internal2_pct', 'absences', 'failures',
+               'predicted_pct', 'predicted_cgpa', 'status', 'top_factors', 'model_tag']
+
+# --- CHUNKED SCORING ---
+def count_students(sem=None, db_path=DB_PATH):
+    conn = sqlite3.connect(db_path)
+    if sem is None: total = conn.execute("SELECT COUNT(*) FROM students").fetchone()[0]
+    else: total = conn.execute("SELECT COUNT(*) FROM students WHERE sem = ?", (sem,)).fetchone()[0]
+    conn.close()
+    return total
+
+def iter_scored_rows(sem=None, db_path=DB_PATH, registry=None, with_factors=True, chunk_size=CHUNK_SIZE):
+    # Yields one dict per student; only `chunk_size` rows are held at a time
+    registry = registry or ModelRegistry()
+    query = EXPORT_QUERY + (" WHERE s.sem = ?" if sem is not None else "") + " ORDER BY s.usn"
+    params = (sem,) if sem is not None else ()
+    conn = sqlite3.connect(db_path)
+    try:
+        for chunk in pd.read_sql_query(query, conn, params=params, chunksize=chunk_size):
+            chunk['model_tag'] = model_tags(chunk, registry)
+            for tag, group in chunk.groupby('model_tag', sort=False):
+                first = group.iloc[0]
+                model, feature_names = registry.get(sem=int(first['sem']), dept=dept_from_usn(first['usn']))
+                input_df = build_model_frame(group, feature_names)
+                scores = apply_overrides(model.predict(input_df), input_df['absences'])
+                factors = explain_factors_batch(model, input_df, feature_names) if with_factors else [""] * len(group)
+                for row, score, factor in zip(group.itertuples(index=False), scores, factors):
+                    pct = to_percentage(score)
+                    yield {
+                        'usn': row.usn, 'name': row.name, 'sem': int(row.sem),
+                        'internal1_pct': round(row.internal1 * 5, 1), 'internal2_pct': round(row.internal2 * 5, 1),
+                        'absences': int(row.absences), 'failures': int(row.failures),
+                        'predicted_pct': round(float(pct), 2), 'predicted_cgpa': round(float(score) / 2, 2),
+                        'status': grade_status(pct), 'top_factors': factor, 'model_tag': tag,
+                    }
+    finally:
+        conn.close()
+
+# --- CSV ---
+def iter_csv(rows):
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, fieldnames=CSV_COLUMNS)
+    writer.writeheader()
+    for row in rows:
+        writer.writerow(row)
+        # Hand out roughly 64 KB at a time rather than one tiny string per row
+        if buf.tell() > 65536:
+            yield buf.getvalue().encode('utf-8')
+            buf.seek(0); buf.truncate()
+    if buf.tell(): yield buf.getvalue().encode('utf-8')
+
+# --- MARKDOWN / ZIP ---
+def student_report_md(row):
+    return f"""# University Student Report
+
+- **Name:** {row['name']}
+- **USN:** {row['usn']}
+- **Semester:** {row['sem']}
+
+## Academic Performance
+- Internal 1: {row['internal1_pct']:.1f}%
+- Internal 2: {row['internal2_pct']:.1f}%
+- Absences: {row['absences']}
+- Past Failures: {row['failures']}
+
+## AI Forecast
+- Predicted Percentage: {row['predicted_pct']:.2f}%
+- Predicted CGPA: {row['predicted_cgpa']:.2f}
+- Status: {row['status']}
+
+## Key Factors
+{row['top_factors'] or 'Not computed for this export.'}
+
+---
+Generated by Uni. AI Portal on {datetime.now():%Y-%m-%d} (model {row['model_tag']})
+"""
+
+class _ChunkSink(io.RawIOBase):
+    # Write-only buffer zipfile streams into; the generator drains it after each file
+    def __init__(self):
+        self.data = bytearray()
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        self.data += b
+        return len(b)
+
+    def drain(self):
+        out = bytes(self.data)
+        self.data.clear()
+        return out
+
+def iter_reports_zip(rows):
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_DEFLATED) as zf:
+        for row in rows:
+            zf.writestr(f"{row['usn']}_Report.md", student_report_md(row))
+            if len(sink.data) > 65536: yield sink.drain()
+    # Closing the archive writes the central directory
+    yield sink.drain()
+
+def write_export(chunks, path):
+    with open(path, 'wb') as f:
+        for chunk in chunks: f.write(chunk)
+
+# --- BACKGROUND EXPORT (dashboard) ---
+class ExportJob(threading.Thread):
+    # Writes to `<out_path>.part` and renames on success, so a finished path is always a complete file
+    def __init__(self, out_path, sem=None, fmt="csv", with_factors=True, registry=None, db_path=DB_PATH, ttl=EXPORT_TTL):
+        super().__init__(daemon=True)
+        self.out_path = out_path
+        self.sem, self.fmt, self.with_factors = sem, fmt, with_factors
+        self.registry, self.db_path, self.ttl = registry, db_path, ttl
+        self.total = count_students(sem, db_path)
+        self.done = 0
+        self.error = None
+        self.finished = False
+        self._cancel = threading.Event()
+
+    def _counted(self, rows):
+        for row in rows:
+            if self._cancel.is_set(): raise RuntimeError("Export cancelled")
+            self.done += 1
+            yield row
+
+    def run(self):
+        part = self.out_path + ".part"
+        try:
+            rows = self._counted(iter_scored_rows(self.sem, self.db_path, self.registry, self.with_factors))
+            write_export(iter_csv(rows) if self.fmt == "csv" else iter_reports_zip(rows), part)
+            os.replace(part, self.out_path)
+        except Exception as e:
+            self.error = str(e)
+            if os.path.exists(part): os.remove(part)
+            return
+        finally:
+            self.finished = True
+        # The file sits on an unauthenticated route: delete it after the TTL even if nobody logs out
+        if not self._cancel.wait(self.ttl):
+            try: os.remove(self.out_path)
+            except FileNotFoundError: pass  # already purged
+
+    def cancel(self):
+        self._cancel.set()
+
+    def cleanup(self):
+        # Stop the writer (it checks the flag between rows) and remove whatever it left on disk
+        self.cancel()
+        if self.is_alive(): self.join(timeout=30)
+        for path in (self.out_path, self.out_path + ".part"):
+            if os.path.exists(path): os.remove(path)
+
+def purge_exports(out_dir, max_age=EXPORT_TTL):
+    # Exports whose job thread is gone (server restart) would otherwise never expire
+    if not os.path.isdir(out_dir): return
+    cutoff = time.time() - max_age
+    for name in os.listdir(out_dir):
+        path = os.path.join(out_dir, name)
+        if os.path.isfile(path) and os.path.getmtime(path) < cutoff: os.remove(path)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stream cohort predictions to CSV or a ZIP of per-student Markdown reports")
+    parser.add_argument("--sem", type=int, default=None, help="Semester to export (default: all)")
+    parser.add_argument("--format", choices=["csv", "zip"], default="csv")
+    parser.add_argument("--out", default=None)
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--no-factors", action="store_true", help="Skip SHAP top factors (much faster)")
+    args = parser.parse_args()
+
+    out = args.out or f"cohort_{'all' if args.sem is None else f'sem{args.sem}'}.{args.format}"
+    rows = iter_scored_rows(args.sem, args.db, with_factors=not args.no_factors)
+    write_export(iter_csv(rows) if args.format == "csv" else iter_reports_zip(rows), out)
+    print(f"Export written to {out}")
@@ -0,0 +1,80 @@
+import sqlite3
+import pandas as pd
+from history_store import init_history, record_snapshot
+
+DB_PATH = 'college_data.db'
+
+# Explicit columns: a s.*, p.* join repeats 'usn', which breaks row['usn'] lookups
+STUDENT_COLUMNS = """s.usn, s.name, s.dob, s.sem, s.internal1, s.internal2, s.absences, s.failures,
+                     p.study_time, p.health, p.famrel, p.goout, p.freetime"""
+
+def ensure_history_table(db_path=DB_PATH):
+    # Older databases predate the history log; create it and backfill baseline snapshots
+    conn = sqlite3.connect(db_path)
+    init_history(conn.cursor())
+    conn.commit()
+    conn.close()
+
+def load_all_students(db_path=DB_PATH):
+    conn = sqlite3.connect(db_path)
+    df = pd.read_sql_query(f"SELECT {STUDENT_COLUMNS} FROM students s JOIN proctorial p ON s.usn = p.usn", conn)
+    conn.close()
+    return df
+
+def get_student_by_usn(usn, db_path=DB_PATH):
+    conn = sqlite3.connect(db_path)
+    df = pd.read_sql_query(f"SELECT {STUDENT_COLUMNS} FROM students s JOIN proctorial p ON s.usn = p.usn WHERE s.usn = ?", conn, params=(usn,))
+    conn.close()
+    return df.iloc[0] if not df.empty else None
+
+def add_new_student(data, db_path=DB_PATH):
+    conn = sqlite3.connect(db_path)
+    c = conn.cursor()
+    try:
+        c.execute("INSERT INTO students VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                  (data['usn'], data['name'], data['dob'], data['sem'], data['g1'], data['g2'], data['absences'], data['failures']))
+        c.execute("INSERT INTO proctorial VALUES (?, ?, ?, ?, ?, ?)",
+                  (data['usn'], data['study_time'], data['health'], data['famrel'], data['goout'], data['freetime']))
+        record_snapshot(c, data['usn'])
+        conn.commit()
+        return True
+    except: return False
+    finally: conn.close()
+
+def update_student(data, db_path=DB_PATH, raise_errors=False):
+    # raise_errors lets callers such as the load test see the real error (e.g. "database is locked")
+    conn = sqlite3.connect(db_path)
+    c = conn.cursor()
+    try:
+        # Update Students Table
+        c.execute("""UPDATE students SET name=?, dob=?, sem=?, internal1=?, internal2=?, absences=?, failures=? WHERE usn=?""",
+                  (data['name'], data['dob'], data['sem'], data['g1'], data['g2'], data['absences'], data['failures'], data['usn']))
+        # Update Proctorial Table
+        c.execute("""UPDATE proctorial SET study_time=?, health=?, famrel=?, goout=?, freetime=? WHERE usn=?""",
+                  (data['study_time'], data['health'], data['famrel'], data['goout'], data['freetime'], data['usn']))
+        # One snapshot for the whole edit, taken once both tables hold the new values
+        record_snapshot(c, data['usn'])
+        conn.commit()
+        return True
+    except Exception as e:
+        if raise_errors: raise
+        print(e)
+        return False
+    finally: conn.close()
+
+def delete_student(usn, db_path=DB_PATH):
+    conn = sqlite3.connect(db_path)
+    c = conn.cursor()
+    try:
+        c.execute("DELETE FROM proctorial WHERE usn=?", (usn,))
+        c.execute("DELETE FROM students WHERE usn=?", (usn,))
+        conn.commit()
+        return True
+    except: return False
+    finally: conn.close()
+
+def verify_student(usn, dob, db_path=DB_PATH):
+    conn = sqlite3.connect(db_path)
+    df = pd.read_sql_query(f"SELECT {STUDENT_COLUMNS} FROM students s JOIN proctorial p ON s.usn = p.usn WHERE s.usn = ? AND s.dob = ?", conn, params=(usn, dob))
+    conn.close()
+    return df.iloc[0] if not df.empty else None
@@ -0,0 +1,125 @@
+import os
+import json
+import threading
+from bisect import bisect_right
+import numpy as np
+import pandas as pd
+
+REFERENCE_PATH = "drift_reference.json"
+STATE_PATH = "drift_state.json"
+FLUSH_EVERY = 50  # live counts are written to disk every N predictions
+
+# --- REFERENCE (training distribution) ---
+def _bin_edges(values):
+    values = np.asarray(values, dtype=float)
+    uniq = np.unique(values)
+    if len(uniq) <= 10:
+        # Discrete feature: one bin per observed value
+        return ((uniq[:-1] + uniq[1:]) / 2).tolist()
+    # Continuous feature: decile cut points
+    return np.unique(np.quantile(values, np.linspace(0.1, 0.9, 9))).tolist()
+
+def build_reference(X):
+    reference = {}
+    for col in X.columns:
+        edges = _bin_edges(X[col])
+        counts = np.bincount(np.searchsorted(edges, X[col].astype(float), side='right'), minlength=len(edges) + 1)
+        reference[col] = {"edges": edges, "counts": counts.tolist()}
+    return reference
+
+def save_reference(X, path=REFERENCE_PATH):
+    with open(path, 'w') as f:
+        json.dump(build_reference(X), f)
+
+def load_reference(path=REFERENCE_PATH):
+    if not os.path.exists(path): return None
+    with open(path) as f:
+        return json.load(f)
+
+# --- METRICS ---
+def psi(expected, actual, eps=1e-4):
+    e = np.asarray(expected, dtype=float); a = np.asarray(actual, dtype=float)
+    e = np.clip(e / e.sum(), eps, None); a = np.clip(a / a.sum(), eps, None)
+    return float(np.sum((a - e) * np.log(a / e)))
+
+def ks(expected, actual):
+    # KS statistic on the binned CDFs (a lower bound on the exact statistic)
+    e = np.cumsum(expected) / np.sum(expected); a = np.cumsum(actual) / np.sum(actual)
+    return float(np.max(np.abs(a - e)))
+
+def psi_status(value):
+    return "Stable" if value < 0.1 else ("Moderate Drift" if value < 0.25 else "Significant Drift")
+
+# --- STREAMING MONITOR ---
+# Keeps one histogram per feature over the training bins; each prediction
+# costs one bisect per feature, independent of how many have been seen.
+class DriftMonitor:
+    def __init__(self, reference_path=REFERENCE_PATH, state_path=STATE_PATH):
+        self.reference_path = reference_path
+        self.state_path = state_path
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._reference_mtime = None
+        self.reference = {}
+        self.counts = {}
+        self.n = 0
+        self._refresh_reference()
+        if state_path and os.path.exists(state_path):
+            with open(state_path) as f:
+                saved = json.load(f)
+            # Saved counts are only meaningful over the exact same bins
+            if saved.get("edges") == self._edges():
+                self.counts = saved["counts"]
+                self.n = saved["n"]
+
+    def _edges(self):
+        return {feat: ref["edges"] for feat, ref in self.reference.items()}
+
+    def _refresh_reference(self):
+        # Re-read the reference only when it changes on disk (e.g. after retraining)
+        mtime = os.path.getmtime(self.reference_path) if os.path.exists(self.reference_path) else None
+        if mtime == self._reference_mtime: return
+        self._reference_mtime = mtime
+        old_edges = self._edges()
+        self.reference = load_reference(self.reference_path) or {}
+        if self._edges() != old_edges or not self.counts:
+            # New bins: live counts over the old ones are no longer comparable
+            self.counts = {feat: [0] * len(ref["counts"]) for feat, ref in self.reference.items()}
+            self.n = 0
+
+    def update(self, input_df):
+        # `input_df` is the model input frame (one or more rows)
+        values = input_df.to_numpy(dtype=float)
+        with self._lock:
+            self._refresh_reference()
+            if not self.reference: return
+            columns = {feat: j for j, feat in enumerate(input_df.columns) if feat in self.reference}
+            for feat, j in columns.items():
+                edges, counts = self.reference[feat]["edges"], self.counts[feat]
+                for value in values[:, j]:
+                    counts[bisect_right(edges, value)] += 1
+            self.n += len(input_df)
+            self._pending += len(input_df)
+            if self._pending >= FLUSH_EVERY: self._flush()
+
+    def _flush(self):
+        if not self.state_path: return
+        tmp_path = self.state_path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({"n": self.n, "counts": self.counts, "edges": self._edges()}, f)
+        os.replace(tmp_path, self.state_path)
+        self._pending = 0
+
+    def report(self):
+        with self._lock:
+            self._refresh_reference()
+            reference = self.reference
+            counts = {feat: list(c) for feat, c in self.counts.items()}
+        rows = []
+        for feat, ref in reference.items():
+            live = counts[feat]
+            if sum(live) == 0: continue
+            value = psi(ref["counts"], live)
+            rows.append({"feature": feat, "psi": value, "ks": ks(ref["counts"], live), "status": psi_status(value)})
+        if not rows: return pd.DataFrame(columns=["feature", "psi", "ks", "status"])
+        return pd.DataFrame(rows).sort_values("psi", ascending=False).reset_index(drop=True)
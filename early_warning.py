@@ -0,0 +1,126 @@
+import argparse
+import sqlite3
+import time
+from datetime import datetime
+import pandas as pd
+from prediction import predict_scores, to_percentage, grade_status
+from model_registry import ModelRegistry, dept_from_usn, model_tags
+from history_store import init_history
+
+DB_PATH = 'college_data.db'
+CHUNK_SIZE = 5000
+
+def init_alerts(c):
+    # Current at-risk queue: one open alert per student
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS alerts (
+            usn TEXT PRIMARY KEY,
+            name TEXT,
+            sem INTEGER,
+            predicted_pct REAL,
+            status TEXT,
+            model_tag TEXT,
+            flagged_at TEXT,
+            updated_at TEXT
+        )
+    ''')
+    # What each student was last scored against (record version from student_changes + model version)
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS scan_state (
+            usn TEXT PRIMARY KEY,
+            last_version INTEGER,
+            model_tag TEXT,
+            scanned_at TEXT
+        )
+    ''')
+    # Scan state written before the change marker existed; those students are rescored once
+    if 'last_version' not in [col[1] for col in c.execute("PRAGMA table_info(scan_state)")]:
+        c.execute("ALTER TABLE scan_state ADD COLUMN last_version INTEGER")
+
+# Explicit columns so the join does not repeat 'usn'
+SCAN_QUERY = '''
+    SELECT s.usn, s.name, s.sem, s.internal1, s.internal2, s.absences, s.failures,
+           p.study_time, p.health, p.famrel, p.goout, p.freetime,
+           COALESCE(sc.version, 0) AS change_version,
+           ss.last_version AS scanned_version, ss.model_tag AS scanned_model_tag
+    FROM students s
+    JOIN proctorial p ON s.usn = p.usn
+    LEFT JOIN student_changes sc ON sc.usn = s.usn
+    LEFT JOIN scan_state ss ON ss.usn = s.usn
+'''
+
+def run_scan(db_path=DB_PATH, registry=None, full=False, chunk_size=CHUNK_SIZE):
+    registry = registry or ModelRegistry()
+    started = time.time()
+    conn = sqlite3.connect(db_path)
+    c = conn.cursor()
+    init_history(c)
+    init_alerts(c)
+    conn.commit()
+
+    # 50k rows of a dozen numeric columns is small; scoring and writes are what get chunked
+    students = pd.read_sql_query(SCAN_QUERY, conn)
+    scanned = len(students)
+    students['model_tag'] = model_tags(students, registry)
+    if not full:
+        students = students[students['scanned_version'].isna()
+                            | (students['change_version'] != students['scanned_version'])
+                            | (students['model_tag'] != students['scanned_model_tag'])]
+
+    rescored, flagged = 0, 0
+    for start in range(0, len(students), chunk_size):
+        chunk = students.iloc[start:start + chunk_size]
+        now = datetime.now().isoformat(timespec='seconds')
+        alerts, cleared, states = [], [], []
+        for tag, group in chunk.groupby('model_tag'):
+            first = group.iloc[0]
+            model, feature_names = registry.get(sem=int(first['sem']), dept=dept_from_usn(first['usn']))
+            pcts = to_percentage(predict_scores(model, group, feature_names))
+            for row, pct in zip(group.itertuples(index=False), pcts):
+                status = grade_status(pct)
+                if status == "Risk": alerts.append((row.usn, row.name, int(row.sem), float(pct), status, tag, now, now))
+                else: cleared.append((row.usn,))
+                states.append((row.usn, int(row.change_version), tag, now))
+
+        c.executemany('''
+            INSERT INTO alerts (usn, name, sem, predicted_pct, status, model_tag, flagged_at, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(usn) DO UPDATE SET name=excluded.name, sem=excluded.sem, predicted_pct=excluded.predicted_pct,
+                status=excluded.status, model_tag=excluded.model_tag, updated_at=excluded.updated_at
+        ''', alerts)
+        c.executemany("DELETE FROM alerts WHERE usn = ?", cleared)
+        c.executemany("INSERT OR REPLACE INTO scan_state (usn, last_version, model_tag, scanned_at) VALUES (?, ?, ?, ?)", states)
+        conn.commit()
+        rescored += len(states)
+        flagged += len(alerts)
+
+    # Students deleted since the last run drop out of the queue
+    c.execute("DELETE FROM alerts WHERE usn NOT IN (SELECT usn FROM students)")
+    c.execute("DELETE FROM scan_state WHERE usn NOT IN (SELECT usn FROM students)")
+    conn.commit()
+    conn.close()
+    return {'scanned': scanned, 'rescored': rescored, 'flagged': flagged, 'seconds': time.time() - started}
+
+def get_alert_queue(db_path=DB_PATH):
+    conn = sqlite3.connect(db_path)
+    c = conn.cursor()
+    init_alerts(c)
+    conn.commit()
+    df = pd.read_sql_query("SELECT * FROM alerts ORDER BY predicted_pct ASC", conn)
+    conn.close()
+    return df
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Early-warning scan: flag at-risk students into the alerts table")
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--full", action="store_true", help="Rescore every student, not only changed ones")
+    parser.add_argument("--every", type=int, default=0, help="Repeat every N seconds (0 = run once)")
+    args = parser.parse_args()
+
+    registry = ModelRegistry()
+    while True:
+        result = run_scan(args.db, registry, full=args.full)
+        print(f"[{datetime.now():%Y-%m-%d %H:%M:%S}] Scanned {result['scanned']}, rescored {result['rescored']}, "
+              f"newly flagged/updated {result['flagged']} in {result['seconds']:.1f}s")
+        if not args.every: break
+        time.sleep(args.every)
@@ -0,0 +1,140 @@
+import sqlite3
+import pandas as pd
+
+DB_PATH = 'college_data.db'
+
+# Columns captured on every snapshot (same names as the live tables)
+SNAPSHOT_COLUMNS = ['internal1', 'internal2', 'absences', 'failures',
+                    'study_time', 'health', 'famrel', 'goout', 'freetime']
+
+# Appends the current joined state of the matching students, skipping any whose
+# latest history row already holds the same values (so re-runs add nothing)
+SNAPSHOT_INSERT = '''
+    INSERT INTO student_history (usn, sem, recorded_at, internal1, internal2, absences, failures,
+                                 study_time, health, famrel, goout, freetime)
+    SELECT s.usn, s.sem, strftime('%Y-%m-%dT%H:%M:%S', 'now', 'localtime'), s.internal1, s.internal2, s.absences, s.failures,
+           p.study_time, p.health, p.famrel, p.goout, p.freetime
+    FROM students s JOIN proctorial p ON s.usn = p.usn
+    WHERE {target}
+      AND (s.sem, s.internal1, s.internal2, s.absences, s.failures, p.study_time, p.health, p.famrel, p.goout, p.freetime)
+          IS NOT (SELECT h.sem, h.internal1, h.internal2, h.absences, h.failures, h.study_time, h.health, h.famrel, h.goout, h.freetime
+                  FROM student_history h WHERE h.usn = s.usn ORDER BY h.id DESC LIMIT 1)
+'''
+
+# A USN can be deleted and re-used; only rows after its latest 'deleted' marker belong to the current student
+CURRENT_ENROLLMENT = "h.id > COALESCE((SELECT MAX(d.id) FROM student_history d WHERE d.usn = h.usn AND d.event = 'deleted'), 0)"
+
+def init_history(c):
+    # Append-only log: one row per change to a student's tracked values, never rewritten
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS student_history (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            usn TEXT NOT NULL,
+            sem INTEGER NOT NULL,
+            recorded_at TEXT NOT NULL,
+            internal1 REAL,
+            internal2 REAL,
+            absences INTEGER,
+            failures INTEGER,
+            study_time INTEGER,
+            health INTEGER,
+            famrel INTEGER,
+            goout INTEGER,
+            freetime INTEGER,
+            event TEXT NOT NULL DEFAULT 'snapshot'  -- 'snapshot' or 'deleted'
+        )
+    ''')
+    # Logs created before deletion markers existed
+    if 'event' not in [col[1] for col in c.execute("PRAGMA table_info(student_history)")]:
+        c.execute("ALTER TABLE student_history ADD COLUMN event TEXT NOT NULL DEFAULT 'snapshot'")
+    # Range queries: "all changes for USN X" and "trend for semester N"
+    c.execute("CREATE INDEX IF NOT EXISTS idx_history_usn ON student_history (usn, recorded_at)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_history_sem ON student_history (sem, recorded_at)")
+    # Latest row per USN (dedupe check and enrollment boundary)
+    c.execute("CREATE INDEX IF NOT EXISTS idx_history_usn_id ON student_history (usn, id)")
+    # Immutability is enforced by the database, not by convention
+    c.execute('''
+        CREATE TRIGGER IF NOT EXISTS history_no_update BEFORE UPDATE ON student_history
+        BEGIN SELECT RAISE(ABORT, 'student_history is append-only'); END
+    ''')
+    c.execute('''
+        CREATE TRIGGER IF NOT EXISTS history_no_delete BEFORE DELETE ON student_history
+        BEGIN SELECT RAISE(ABORT, 'student_history is append-only'); END
+    ''')
+    # Deleting a student closes its enrollment, so a re-added USN starts a fresh trajectory
+    c.execute('''
+        CREATE TRIGGER IF NOT EXISTS history_on_student_delete AFTER DELETE ON students
+        BEGIN
+            INSERT INTO student_history (usn, sem, recorded_at, event)
+            VALUES (OLD.usn, OLD.sem, strftime('%Y-%m-%dT%H:%M:%S', 'now', 'localtime'), 'deleted');
+        END
+    ''')
+    # Change marker for the early-warning scan: every write to the live tables bumps the student's
+    # version, whichever code path made it. Snapshots are taken separately, once per committed write.
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS student_changes (
+            usn TEXT PRIMARY KEY,
+            version INTEGER NOT NULL,
+            changed_at TEXT NOT NULL
+        )
+    ''')
+    for table in ('students', 'proctorial'):
+        for op in ('INSERT', 'UPDATE'):
+            # Earlier snapshot-per-statement triggers logged the half-written state between the two tables
+            c.execute(f"DROP TRIGGER IF EXISTS history_on_{table}_{op.lower()}")
+            c.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS changes_on_{table}_{op.lower()} AFTER {op} ON {table}
+                BEGIN
+                    INSERT INTO student_changes (usn, version, changed_at)
+                    VALUES (NEW.usn, 1, strftime('%Y-%m-%dT%H:%M:%S', 'now', 'localtime'))
+                    ON CONFLICT(usn) DO UPDATE SET version = version + 1, changed_at = excluded.changed_at;
+                END
+            ''')
+    c.execute('''
+        INSERT OR IGNORE INTO student_changes (usn, version, changed_at)
+        SELECT usn, 1, strftime('%Y-%m-%dT%H:%M:%S', 'now', 'localtime') FROM students
+    ''')
+    # Baseline snapshot for students that predate the log (or whose state was never logged)
+    # (also catches up writes made outside add_new_student/update_student)
+    c.execute(SNAPSHOT_INSERT.format(target="1"))
+
+def record_snapshot(c, usn):
+    # Call after every statement of a write, before commit, so the log only holds states that existed
+    c.execute(SNAPSHOT_INSERT.format(target="s.usn = ?"), (usn,))
+
+# --- QUERIES (served from the history table, never the live tables) ---
+def get_student_history(usn, db_path=DB_PATH):
+    conn = sqlite3.connect(db_path)
+    df = pd.read_sql_query(f"SELECT * FROM student_history h WHERE h.usn = ? AND h.event = 'snapshot' AND {CURRENT_ENROLLMENT} "
+                           "ORDER BY h.id", conn, params=(usn,))
+    conn.close()
+    return df
+
+def get_semester_trend(sem, column='absences', db_path=DB_PATH):
+    # Cohort average as of each day: every student's latest snapshot so far is carried forward,
+    # so a day on which only a few students changed does not stand in for the whole semester
+    if column not in SNAPSHOT_COLUMNS:
+        raise ValueError(f"Unknown history column: {column}")
+    conn = sqlite3.connect(db_path)
+    df = pd.read_sql_query(
+        f"SELECT h.usn, substr(h.recorded_at, 1, 10) AS day, h.sem, h.{column} AS value "
+        f"FROM student_history h WHERE h.event = 'snapshot' AND {CURRENT_ENROLLMENT} "
+        "AND h.usn IN (SELECT usn FROM student_history WHERE sem = ?) ORDER BY h.id",
+        conn, params=(sem,))
+    conn.close()
+    if df.empty: return pd.DataFrame(columns=['day', 'avg_value', 'students', 'updates'])
+
+    # Latest state per student per day; a student counts towards this semester while that state has sem == N
+    df = df.groupby(['usn', 'day'], sort=False).last().reset_index().sort_values(['usn', 'day'])
+    df['in_sem'] = (df['sem'] == sem).astype(int)
+    df['contrib'] = df['value'].where(df['in_sem'] == 1, 0)
+    prev = df.groupby('usn')[['in_sem', 'contrib']].shift(fill_value=0)
+    df['d_count'] = df['in_sem'] - prev['in_sem']
+    df['d_sum'] = df['contrib'] - prev['contrib']
+
+    # Running cohort size and sum, changed only by the students updated that day
+    daily = df.groupby('day').agg(d_sum=('d_sum', 'sum'), d_count=('d_count', 'sum'), updates=('in_sem', 'sum'))
+    daily['students'] = daily['d_count'].cumsum()
+    daily['avg_value'] = daily['d_sum'].cumsum() / daily['students'].where(daily['students'] > 0)
+    daily = daily.reset_index()
+    return daily.loc[daily['students'] > 0, ['day', 'avg_value', 'students', 'updates']].reset_index(drop=True)
@@ -0,0 +1,191 @@
+import argparse
+import os
+import random
+import resource
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from setup_database import init_db
+from history_store import init_history
+from database import verify_student, get_student_by_usn, update_student
+from model_registry import ModelRegistry
+from prediction import run_prediction
+from drift_monitor import DriftMonitor
+
+# Simulates a class logging in at result time. Sessions run as threads in one
+# process, the same way Streamlit serves them, against a seeded SQLite copy and a
+# stubbed LLM (no network). Run from the project folder so the models are found.
+
+STAGES = ["login", "profile", "prediction", "report_llm", "simulator", "study_plan_llm", "admin_update"]
+DEPTS = ["MCA", "CSE", "ISE", "ECE"]
+
+# --- SEEDED DATABASE ---
+def seed_database(db_path, n_students, seed=42):
+    init_db(db_path)
+    rng = random.Random(seed)
+    students, proctorial, credentials = [], [], []
+    for i in range(n_students):
+        # Keeps the 1RV23MCA001 layout so department routing works
+        usn = f"{1 + i // 40000}LT{20 + (i // 4000) % 10}{DEPTS[(i // 1000) % 4]}{i % 1000:03d}"
+        dob = f"{rng.randint(1998, 2005)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+        students.append((usn, f"Student {i}", dob, rng.randint(1, 8), rng.randint(0, 20), rng.randint(0, 20),
+                         rng.randint(0, 40), rng.randint(0, 3)))
+        proctorial.append((usn, rng.randint(1, 4), rng.randint(1, 5), rng.randint(1, 5), rng.randint(1, 5), rng.randint(1, 5)))
+        credentials.append((usn, dob))
+    conn = sqlite3.connect(db_path)
+    c = conn.cursor()
+    c.executemany("INSERT OR REPLACE INTO students VALUES (?, ?, ?, ?, ?, ?, ?, ?)", students)
+    c.executemany("INSERT OR REPLACE INTO proctorial VALUES (?, ?, ?, ?, ?, ?)", proctorial)
+    init_history(c)  # baseline snapshots for the bulk-inserted students
+    conn.commit()
+    conn.close()
+    return credentials
+
+# --- STUBBED LLM ---
+def stub_llm(prompt, latency):
+    time.sleep(latency)
+    return f"Stubbed counselor response ({len(prompt)} prompt chars)."
+
+# --- METRICS ---
+class Recorder:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.sessions_ok = 0
+        self.sessions_failed = 0
+        self._lock = threading.Lock()
+
+    def timed(self, stage, fn, *args):
+        start = time.perf_counter()
+        try:
+            result = fn(*args)
+        except sqlite3.OperationalError as e:
+            self._error("db_locked" if "locked" in str(e) else "db_error")
+            raise
+        except Exception as e:
+            self._error(type(e).__name__)
+            raise
+        with self._lock:
+            self.latencies[stage].append(time.perf_counter() - start)
+        return result
+
+    def _error(self, kind):
+        with self._lock:
+            self.errors[kind] += 1
+
+class MemorySampler(threading.Thread):
+    # Polls the process RSS so the report shows the peak during the run
+    def __init__(self, interval=0.2):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.start_mb = self.current_mb()
+        self.peak_mb = self.start_mb
+        self._stop_event = threading.Event()
+
+    @staticmethod
+    def current_mb():
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1e6
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            self.peak_mb = max(self.peak_mb, self.current_mb())
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+        self.peak_mb = max(self.peak_mb, self.current_mb())
+
+# --- SESSION FLOW (same calls as app.py) ---
+def simulate(registry, s):
+    sim_profile = s.copy()
+    sim_profile['study_time'] = 4; sim_profile['absences'] = 0
+    run_prediction(registry, s)
+    return run_prediction(registry, sim_profile)
+
+def admin_update(db_path, s):
+    # The app's edit form: rewrites both the students and proctorial rows
+    data = {'usn': s['usn'], 'name': s['name'], 'dob': s['dob'], 'sem': int(s['sem']),
+            'g1': float(s['internal1']), 'g2': float(s['internal2']), 'absences': int(s['absences']) + 1,
+            'failures': int(s['failures']), 'study_time': int(s['study_time']), 'health': int(s['health']),
+            'famrel': int(s['famrel']), 'goout': int(s['goout']), 'freetime': int(s['freetime'])}
+    update_student(data, db_path, raise_errors=True)
+
+def run_session(args, registry, drift, credentials, rec, rng):
+    think = lambda: time.sleep(rng.uniform(0, 2 * args.think_time))
+    usn, dob = rng.choice(credentials)
+    try:
+        s = rec.timed("login", verify_student, usn, dob, args.db); think()
+        rec.timed("profile", get_student_by_usn, usn, args.db); think()
+        score, factors = rec.timed("prediction", run_prediction, registry, s, drift)
+        rec.timed("report_llm", stub_llm, f"{s['name']} {score:.1f} {factors}", args.llm_latency); think()
+        rec.timed("simulator", simulate, registry, s); think()
+        rec.timed("study_plan_llm", stub_llm, f"study plan {s['study_time']}", args.llm_latency)
+        if rng.random() < args.write_ratio:
+            rec.timed("admin_update", admin_update, args.db, s)
+        with rec._lock: rec.sessions_ok += 1
+    except Exception:
+        with rec._lock: rec.sessions_failed += 1
+
+def print_report(args, rec, memory, wall):
+    total = rec.sessions_ok + rec.sessions_failed
+    print("\n" + "=" * 72)
+    print(f" LOAD TEST: {total} sessions, concurrency {args.concurrency}, think {args.think_time}s, LLM stub {args.llm_latency}s")
+    print("=" * 72)
+    print(f"Wall time:   {wall:.1f}s")
+    print(f"Throughput:  {rec.sessions_ok / wall:.2f} sessions/s completed")
+    print(f"Failed:      {rec.sessions_failed} sessions ({100 * rec.sessions_failed / max(total, 1):.1f}%)")
+    print(f"\n{'Stage':<16}{'Count':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'Max ms':>10}")
+    for stage in STAGES:
+        lat = np.array(rec.latencies.get(stage, [])) * 1000
+        if not len(lat): continue
+        p50, p95, p99 = np.percentile(lat, [50, 95, 99])
+        print(f"{stage:<16}{len(lat):>7}{p50:>10.1f}{p95:>10.1f}{p99:>10.1f}{lat.max():>10.1f}")
+    print("\nErrors:      " + (", ".join(f"{k}: {v}" for k, v in sorted(rec.errors.items())) or "none"))
+    print(f"Memory (RSS): start {memory.start_mb:.0f} MB, peak {memory.peak_mb:.0f} MB, "
+          f"max RSS {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024 / 1e6:.0f} MB")
+    print("=" * 72)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Concurrent-session load test for the portal (offline, stubbed LLM)")
+    parser.add_argument("--sessions", type=int, default=200, help="Total simulated student sessions")
+    parser.add_argument("--concurrency", type=int, default=20, help="Sessions in flight at once")
+    parser.add_argument("--think-time", type=float, default=0.5, help="Mean pause between steps (seconds)")
+    parser.add_argument("--llm-latency", type=float, default=1.0, help="Stubbed Gemini response time (seconds)")
+    parser.add_argument("--students", type=int, default=1000, help="Students seeded into the test database")
+    parser.add_argument("--write-ratio", type=float, default=0.1, help="Share of sessions followed by an admin record update")
+    parser.add_argument("--db", default=None, help="SQLite file to start from; it is copied, never modified (default: empty)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    # Seeding and admin updates write to the database and its append-only history,
+    # so the run always works on a scratch copy
+    work_dir = tempfile.mkdtemp(prefix="uni_load_")
+    test_db = os.path.join(work_dir, "college_data.db")
+    if args.db is not None:
+        if not os.path.exists(args.db): parser.error(f"--db {args.db} does not exist")
+        src, dst = sqlite3.connect(args.db), sqlite3.connect(test_db)
+        src.backup(dst)
+        src.close(); dst.close()
+    args.db = test_db
+    print(f"Seeding {args.students} students into {args.db} ...")
+    credentials = seed_database(args.db, args.students, args.seed)
+
+    # One registry and drift monitor shared by all sessions, as with st.cache_resource in the app;
+    # drift counts go to the scratch folder so the dashboard's numbers are untouched
+    registry = ModelRegistry()
+    drift = DriftMonitor(state_path=os.path.join(work_dir, "drift_state.json"))
+    rec = Recorder()
+    memory = MemorySampler()
+    memory.start()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        for i in range(args.sessions):
+            pool.submit(run_session, args, registry, drift, credentials, rec, random.Random(args.seed + i))
+    wall = time.perf_counter() - started
+    memory.stop()
+    print_report(args, rec, memory, wall)
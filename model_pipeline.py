@@ -1,12 +1,16 @@
+import argparse
 import pandas as pd
 from sklearn.model_selection import train_test_split
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.preprocessing import LabelEncoder
+from sklearn.metrics import mean_absolute_error, r2_score
 import joblib
+from model_registry import register_model, file_hash
+from drift_monitor import save_reference
 
-def train_model():
+def train_model(data_path="student-mat.csv", key="default"):
     # 1. Load Data
-    data = pd.read_csv("student-mat.csv", sep=";") 
+    data = pd.read_csv(data_path, sep=";") 
 
     # 2. Preprocessing (Convert text categories to numbers)
     le = LabelEncoder()
@@ -23,10 +27,22 @@ def train_model():
     model = RandomForestRegressor(n_estimators=100, random_state=42)
     model.fit(X_train, y_train)
 
+    y_pred = model.predict(X_test)
+    metrics = {"r2": float(r2_score(y_test, y_pred)), "mae": float(mean_absolute_error(y_test, y_pred))}
+
     # 5. Save Model and Column names for later use
-    joblib.dump(model, "student_grade_model.pkl")
-    joblib.dump(X.columns.tolist(), "feature_names.pkl")
-    print("Model Trained and Saved!")
+    version = register_model(model, X.columns.tolist(), key=key, metrics=metrics, data_hash=file_hash(data_path))
+    if key == "default":
+        # Keep the legacy files for scripts that still load them directly
+        joblib.dump(model, "student_grade_model.pkl")
+        joblib.dump(X.columns.tolist(), "feature_names.pkl")
+        # Training distribution the live drift monitor compares against
+        save_reference(X_train)
+    print(f"Model '{key}' v{version} Trained and Saved! (R²: {metrics['r2']:.3f})")
 
 if __name__ == "__main__":
-    train_model()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Train and register a grade model")
+    parser.add_argument("--data", default="student-mat.csv", help="Training CSV (';' separated)")
+    parser.add_argument("--key", default="default", help="Registry key, e.g. default, sem-4, dept-MCA, dept-MCA-sem-4")
+    args = parser.parse_args()
+    train_model(args.data, args.key)
@@ -0,0 +1,169 @@
+import os
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import datetime
+import joblib
+
+REGISTRY_DIR = "models"
+MANIFEST_FILE = "manifest.json"
+
+# Legacy single-model files written by the original pipeline
+LEGACY_MODEL_PATH = "student_grade_model.pkl"
+LEGACY_FEATURES_PATH = "feature_names.pkl"
+
+# --- ROUTING KEYS ---
+def dept_from_usn(usn):
+    # USN layout: 1RV23MCA001 -> college (1RV), year (23), department (MCA), roll (001)
+    usn = str(usn)
+    return usn[5:-3].upper() if len(usn) > 8 else None
+
+def route_keys(sem=None, dept=None):
+    # Most specific model first, global model last
+    keys = []
+    if dept and sem is not None: keys.append(f"dept-{dept}-sem-{int(sem)}")
+    if sem is not None: keys.append(f"sem-{int(sem)}")
+    if dept: keys.append(f"dept-{dept}")
+    keys.append("default")
+    return keys
+
+def model_tags(students, registry):
+    # Resolve each (sem, dept) route once per batch, not once per student
+    tags, route_cache = [], {}
+    for sem, usn in zip(students['sem'], students['usn']):
+        route = (int(sem), dept_from_usn(usn))
+        if route not in route_cache:
+            key, entry = registry.resolve(*route)
+            route_cache[route] = f"{key}:v{entry['version']}"
+        tags.append(route_cache[route])
+    return tags
+
+def file_hash(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+# --- MANIFEST ---
+def load_manifest(registry_dir=REGISTRY_DIR):
+    path = os.path.join(registry_dir, MANIFEST_FILE)
+    if not os.path.exists(path): return {"models": {}}
+    with open(path) as f:
+        return json.load(f)
+
+def register_model(model, feature_names, key="default", metrics=None, data_hash=None, registry_dir=REGISTRY_DIR):
+    os.makedirs(registry_dir, exist_ok=True)
+    manifest = load_manifest(registry_dir)
+    version = manifest["models"].get(key, {}).get("version", 0) + 1
+    model_file = f"{key}_v{version}.pkl"
+    joblib.dump(model, os.path.join(registry_dir, model_file))
+    manifest["models"][key] = {
+        "version": version,
+        "model_file": model_file,
+        "feature_names": list(feature_names),
+        "metrics": metrics or {},
+        "data_hash": data_hash,
+        "trained_at": datetime.now().isoformat(timespec='seconds'),
+    }
+    # Write-then-rename so a running app never reads a half-written manifest
+    tmp_path = os.path.join(registry_dir, MANIFEST_FILE + ".tmp")
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, os.path.join(registry_dir, MANIFEST_FILE))
+    return version
+
+# --- LRU REGISTRY ---
+# Lazily loads registered models and keeps the most recently used ones in memory.
+# Entries are evicted least-recently-used first once either `max_models` or
+# `max_bytes` (estimated from the pickle size on disk) is exceeded.
+class ModelRegistry:
+    def __init__(self, registry_dir=REGISTRY_DIR, max_models=32, max_bytes=1024 * 1024 * 1024):
+        self.registry_dir = registry_dir
+        self.max_models = max_models
+        self.max_bytes = max_bytes
+        self._cache = OrderedDict()  # (key, version) -> (model, feature_names, size)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._loading = {}  # (key, version) -> lock held by the one session loading it
+        self._manifest = None
+        self._manifest_mtime = None
+
+    def _entries(self):
+        # Re-read the manifest only when it changes on disk (caller holds the lock)
+        path = os.path.join(self.registry_dir, MANIFEST_FILE)
+        mtime = os.path.getmtime(path) if os.path.exists(path) else None
+        reloaded = self._manifest is None or mtime != self._manifest_mtime
+        if reloaded:
+            self._manifest = load_manifest(self.registry_dir)
+            self._manifest_mtime = mtime
+        entries = dict(self._manifest["models"])
+        if "default" not in entries and os.path.exists(LEGACY_MODEL_PATH):
+            entries["default"] = {"version": 0, "model_file": None}
+        if reloaded:
+            # A retrain bumped a version: the old model is never routed to again, so free its slot now
+            for cache_key in [k for k in self._cache if entries.get(k[0], {}).get("version") != k[1]]:
+                _, _, size = self._cache.pop(cache_key)
+                self._bytes -= size
+        return entries
+
+    def resolve(self, sem=None, dept=None):
+        with self._lock:
+            entries = self._entries()
+        for key in route_keys(sem, dept):
+            if key in entries: return key, entries[key]
+        raise FileNotFoundError("No model registered for this route and no default model found.")
+
+    def get(self, sem=None, dept=None):
+        key, entry = self.resolve(sem, dept)
+        cache_key = (key, entry["version"])
+        with self._lock:
+            if cache_key in self._cache:
+                self._cache.move_to_end(cache_key)
+                model, feature_names, _ = self._cache[cache_key]
+                return model, feature_names
+            load_lock = self._loading.setdefault(cache_key, threading.Lock())
+
+        # Cold load outside the registry lock so other models stay available, but only one
+        # session loads a given model; the rest wait here and then take it from the cache
+        with load_lock:
+            with self._lock:
+                if cache_key in self._cache:
+                    self._cache.move_to_end(cache_key)
+                    model, feature_names, _ = self._cache[cache_key]
+                    return model, feature_names
+            try:
+                if entry["model_file"] is None:
+                    path = LEGACY_MODEL_PATH
+                    feature_names = joblib.load(LEGACY_FEATURES_PATH)
+                else:
+                    path = os.path.join(self.registry_dir, entry["model_file"])
+                    feature_names = entry["feature_names"]
+                model = joblib.load(path)
+                size = os.path.getsize(path)
+
+                with self._lock:
+                    # Skip caching if a retrain superseded this version while it was loading
+                    if self._entries().get(key, {}).get("version") == entry["version"]:
+                        self._cache[cache_key] = (model, feature_names, size)
+                        self._bytes += size
+                        self._evict()
+            finally:
+                with self._lock:
+                    self._loading.pop(cache_key, None)
+        return model, feature_names
+
+    def get_for_student(self, student_row):
+        return self.get(sem=student_row.get('sem'), dept=dept_from_usn(student_row.get('usn')))
+
+    def _evict(self):
+        # Always keep the newest entry, even if it alone exceeds the cap
+        while len(self._cache) > 1 and (len(self._cache) > self.max_models or self._bytes > self.max_bytes):
+            _, (_, _, size) = self._cache.popitem(last=False)
+            self._bytes -= size
+
+    def stats(self):
+        with self._lock:
+            return {"loaded": [f"{k} v{v}" for k, v in self._cache], "bytes": self._bytes,
+                    "max_models": self.max_models, "max_bytes": self.max_bytes}
@@ -0,0 +1,104 @@
+import numpy as np
+import shap
+
+# Database column -> model feature
+DB_TO_FEATURE = {
+    'internal1': 'G1', 'internal2': 'G2',
+    'failures': 'failures', 'absences': 'absences',
+    'study_time': 'studytime', 'health': 'health',
+    'famrel': 'famrel', 'goout': 'goout',
+    'freetime': 'freetime',
+}
+
+# --- HUMAN READABLE MAPPING ---
+FEATURE_MAP = {
+    "G1": "Internal Exam 1",
+    "G2": "Internal Exam 2",
+    "absences": "Class Absences",
+    "failures": "Past Failures",
+    "studytime": "Study Time",
+    "health": "Health Status",
+    "famrel": "Family Relationships",
+    "goout": "Social Activity / Partying",
+    "freetime": "Free Time",
+    "Medu": "Mother's Education",
+    "Fedu": "Father's Education",
+    "traveltime": "Commute Time"
+}
+
+# Features the portal does not collect; filled with fixed defaults
+DEFAULT_INPUTS = {
+    'age': 21, 'Medu': 3, 'Fedu': 3, 'traveltime': 1, 'romantic': 0, 'internet': 1,
+    'schoolsup': 0, 'famsup': 1, 'paid': 0, 'activities': 1, 'nursery': 1,
+    'higher': 1, 'famsize': 0, 'Pstatus': 1, 'sex': 1, 'school': 0, 'address': 1,
+    'reason': 1, 'guardian': 1, 'Mjob': 2, 'Fjob': 2, 'walc': 1, 'dalc': 1
+}
+
+def build_model_frame(students, feature_names):
+    # `students` is a DataFrame of joined students/proctorial rows (one or many)
+    input_df = students[list(DB_TO_FEATURE)].rename(columns=DB_TO_FEATURE).reset_index(drop=True)
+    for feat, val in DEFAULT_INPUTS.items(): input_df[feat] = val
+    for c in set(feature_names) - set(input_df.columns): input_df[c] = 0
+    return input_df[feature_names].astype(float)
+
+def apply_overrides(preds, absences):
+    # Logic Overrides (attendance rules on top of the model output)
+    preds = np.asarray(preds, dtype=float)
+    absences = np.asarray(absences, dtype=float)
+    preds = np.select(
+        [absences > 15, absences == 0, absences <= 3],
+        [preds - (absences - 15) * 0.3, preds + 3.0, preds + 1.5],
+        default=preds)
+    return np.clip(preds, 0, 20)
+
+def predict_scores(model, students, feature_names):
+    # Bulk scoring for many students at once (no SHAP)
+    input_df = build_model_frame(students, feature_names)
+    return apply_overrides(model.predict(input_df), input_df['absences'])
+
+def _readable_factors(shap_row, input_row, feature_names):
+    importances = sorted([{
+        'feature': feature,
+        'importance': shap_row[i],
+        'value': input_row.iloc[i]
+    } for i, feature in enumerate(feature_names)], key=lambda x: abs(x['importance']), reverse=True)
+    
+    factors = []
+    for item in importances[:3]: 
+        feat = item['feature']
+        imp = item['importance']
+        val = item['value']
+        if feat == 'absences' and imp < 0 and val < 5: continue 
+        direction = "Positive" if imp > 0 else "Negative"
+        readable_name = FEATURE_MAP.get(feat, feat)
+        factors.append(f"{readable_name} ({direction})")
+    
+    if input_row['absences'] > 15: factors.insert(0, "Extreme Class Absences (Negative)")
+    return ", ".join(factors)
+
+def explain_factors_batch(model, input_df, feature_names):
+    # Top SHAP drivers for every row; one explainer call for the whole batch
+    shap_values = shap.TreeExplainer(model).shap_values(input_df)
+    return [_readable_factors(shap_values[r], input_df.iloc[r], feature_names) for r in range(len(input_df))]
+
+def explain_factors(model, input_df, feature_names):
+    # Top SHAP drivers for a single student, in readable form
+    return explain_factors_batch(model, input_df, feature_names)[0]
+
+def run_prediction(registry, student_row, drift=None):
+    # One student's score and top factors; shared by the dashboard and the load test
+    model, feature_names = registry.get_for_student(student_row)
+    input_df = build_model_frame(student_row.to_frame().T, feature_names)
+
+    # Only real analyses are tracked; simulator what-ifs would skew the histograms
+    if drift is not None: drift.update(input_df)
+
+    pred = apply_overrides(model.predict(input_df), [input_df.iloc[0]['absences']])[0]
+    return pred, explain_factors(model, input_df, feature_names)
+
+# --- DASHBOARD THRESHOLDS ---
+def to_percentage(score):
+    return (score / 20) * 100
+
+def grade_status(pct):
+    return "Distinction" if pct > 75 else ("First Class" if pct > 60 else "Risk")
@@ -1,7 +1,8 @@
 import sqlite3
+from history_store import init_history
 
-def init_db():
-    conn = sqlite3.connect('college_data.db')
+def init_db(db_path='college_data.db'):
+    conn = sqlite3.connect(db_path)
     c = conn.cursor()
 
     # 1. Create Tables (Added 'dob' column)
@@ -43,6 +44,9 @@ def init_db():
     c.execute("INSERT OR REPLACE INTO students VALUES ('1RV23MCA003', 'Karthik R', '2001-12-10', 4, 8, 7, 25, 2)")
     c.execute("INSERT OR REPLACE INTO proctorial VALUES ('1RV23MCA003', 1, 3, 2, 5, 5)")
 
+    # 3. History log (baseline snapshot for every student not yet logged)
+    init_history(c)
+
     conn.commit()
     conn.close()
     print("Database updated with Security Layer (DOB)!")